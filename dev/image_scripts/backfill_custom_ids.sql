@@ -0,0 +1,50 @@
+-- Backfill path-derived Cloudflare Images IDs
+--
+-- Instructions:
+-- 1. Apply migration 006_custom_cloudflare_ids.sql
+-- 2. Upload with custom IDs:
+--      python scripts/upload_cloudflare.py ./caves_1200px $CF_API_TOKEN --custom-ids --log-prefix upload_1200px
+--      python scripts/upload_cloudflare.py ./caves_thumbs $CF_API_TOKEN --custom-ids --id-prefix thumbs/ --log-prefix upload_thumbs
+-- 3. From the directory holding upload_1200px_log.csv and upload_thumbs_log.csv, run once:
+--      psql 'YOUR_CONNECTION_STRING' -f scripts/backfill_custom_ids.sql
+--
+-- Thumbnails are stored under caves_thumbs/ at their thumbnail path, or at
+-- file_path when thumbnail is NULL (as getThumbnailUrl() resolves them).
+--
+-- Only IDs logged as SUCCESS are written, so images that failed to upload
+-- or were missing locally keep their existing (working) Cloudflare ID.
+-- After this, sync_cloudflare_ids.py and update_image_ids.py are no longer
+-- needed for custom-ID uploads.
+
+BEGIN;
+
+CREATE TEMP TABLE upload_1200px_log (
+    timestamp TEXT, status TEXT, file TEXT, image_id TEXT, error TEXT
+) ON COMMIT DROP;
+CREATE TEMP TABLE upload_thumbs_log (
+    timestamp TEXT, status TEXT, file TEXT, image_id TEXT, error TEXT
+) ON COMMIT DROP;
+
+\copy upload_1200px_log FROM 'upload_1200px_log.csv' WITH (FORMAT csv, HEADER true)
+\copy upload_thumbs_log FROM 'upload_thumbs_log.csv' WITH (FORMAT csv, HEADER true)
+
+UPDATE images i
+SET cloudflare_image_id = l.image_id
+FROM (SELECT DISTINCT image_id FROM upload_1200px_log WHERE status = 'SUCCESS') l
+WHERE l.image_id = i.file_path
+  AND i.cloudflare_image_id IS DISTINCT FROM l.image_id;
+
+UPDATE images i
+SET cloudflare_thumbnail_id = l.image_id
+FROM (SELECT DISTINCT image_id FROM upload_thumbs_log WHERE status = 'SUCCESS') l
+WHERE l.image_id = 'thumbs/' || COALESCE(i.thumbnail, i.file_path)
+  AND i.cloudflare_thumbnail_id IS DISTINCT FROM l.image_id;
+
+-- Images or thumbnails not uploaded under their custom ID (left unchanged above)
+SELECT i.image_id, i.file_path, i.cloudflare_image_id, i.cloudflare_thumbnail_id
+FROM images i
+WHERE i.cloudflare_image_id IS DISTINCT FROM i.file_path
+   OR i.cloudflare_thumbnail_id IS DISTINCT FROM 'thumbs/' || COALESCE(i.thumbnail, i.file_path)
+ORDER BY i.file_path;
+
+COMMIT;
@@ -0,0 +1,190 @@
+#!/usr/bin/env python3
+"""
+Precompute related images by text similarity.
+
+Builds TF-IDF vectors over subject, motifs and description of all rank-1
+images, weighting each field like search_vector (subject A, motifs and
+description B). Cosine similarities are computed as sparse matrix products
+in chunks of rows so memory stays bounded, and the top-k neighbors of every
+image are bulk-loaded into the related_images table.
+
+Usage:
+    python scripts/build_related_images.py [--top-k K] [--chunk-size N]
+
+Environment variables:
+    SUPABASE_DB_URL: Postgres connection string for the Supabase database
+
+Output:
+    Replaces the contents of related_images (see 007_related_images.sql)
+"""
+
+import argparse
+import io
+import os
+import sys
+from typing import Dict, List, Tuple
+
+import numpy as np
+import psycopg2
+from scipy import sparse
+
+from build_search_vocabulary import FIELD_WEIGHTS, tokenize
+
+DB_URL = os.getenv("SUPABASE_DB_URL", "")
+DEFAULT_TOP_K = 12
+DEFAULT_CHUNK_SIZE = 512
+MAX_DOC_FREQ = 0.5   # drop terms found in more than half the images
+MIN_SCORE = 0.05     # neighbors below this similarity are not stored
+
+
+def build_tfidf(rows: List[Tuple[int, str, str, str]]) -> sparse.csr_matrix:
+    """
+    Build an L2-normalized TF-IDF matrix with one row per image.
+
+    Args:
+        rows: List of (image_id, subject, motifs, description)
+
+    Returns:
+        Sparse matrix of shape (len(rows), vocabulary size)
+    """
+    vocabulary: Dict[str, int] = {}
+    data, indices, indptr = [], [], [0]
+
+    for _, subject, motifs, description in rows:
+        counts: Dict[int, float] = {}
+        fields = {"subject": subject, "motifs": motifs, "description": description}
+        for field, text in fields.items():
+            for word in tokenize(text):
+                col = vocabulary.setdefault(word, len(vocabulary))
+                counts[col] = counts.get(col, 0.0) + FIELD_WEIGHTS[field]
+        indices.extend(counts.keys())
+        data.extend(counts.values())
+        indptr.append(len(indices))
+
+    tf = sparse.csr_matrix(
+        (np.array(data, dtype=np.float32), np.array(indices), np.array(indptr)),
+        shape=(len(rows), len(vocabulary)),
+    )
+
+    n_docs = tf.shape[0]
+    doc_freq = np.bincount(tf.indices, minlength=tf.shape[1])
+    idf = np.log((1 + n_docs) / (1 + doc_freq)).astype(np.float32) + 1
+    idf[doc_freq > MAX_DOC_FREQ * n_docs] = 0
+
+    tfidf = sparse.csr_matrix(tf @ sparse.diags(idf))
+    tfidf.eliminate_zeros()
+
+    norms = np.sqrt(np.asarray(tfidf.multiply(tfidf).sum(axis=1)).ravel())
+    norms[norms == 0] = 1
+    return sparse.csr_matrix(sparse.diags(1 / norms) @ tfidf)
+
+
+def top_k_neighbors(
+    matrix: sparse.csr_matrix,
+    image_ids: List[int],
+    top_k: int,
+    chunk_size: int
+) -> List[Tuple[int, int, int, float]]:
+    """
+    Find the top-k most similar images for every image.
+
+    Args:
+        matrix: L2-normalized TF-IDF matrix, one row per image
+        image_ids: image_id of each matrix row
+        top_k: Number of neighbors per image
+        chunk_size: Rows multiplied at a time
+
+    Returns:
+        List of (image_id, position, related_image_id, score)
+    """
+    ids = np.asarray(image_ids)
+    transposed = matrix.T.tocsc()
+    k = min(top_k, len(image_ids) - 1)
+    results = []
+
+    for start in range(0, matrix.shape[0], chunk_size):
+        stop = min(start + chunk_size, matrix.shape[0])
+        scores = (matrix[start:stop] @ transposed).toarray()
+        scores[np.arange(stop - start), np.arange(start, stop)] = 0  # not related to itself
+
+        candidates = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+        for offset, row in enumerate(candidates):
+            row = row[np.argsort(-scores[offset, row])]
+            position = 0
+            for col in row:
+                score = float(scores[offset, col])
+                if score < MIN_SCORE:
+                    break
+                position += 1
+                results.append((int(ids[start + offset]), position, int(ids[col]), score))
+
+        print(f"  [{stop}/{matrix.shape[0]}]")
+
+    return results
+
+
+def load_related(cursor, rows: List[Tuple[int, int, int, float]]):
+    """Replace related_images with rows using COPY."""
+    buffer = io.StringIO()
+    for image_id, position, related_id, score in rows:
+        buffer.write(f"{image_id}\t{position}\t{related_id}\t{score:.6f}\n")
+    buffer.seek(0)
+
+    cursor.execute("DELETE FROM related_images")
+    cursor.copy_expert(
+        "COPY related_images (image_id, position, related_image_id, score) FROM STDIN",
+        buffer,
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Precompute related images by text similarity",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog=__doc__
+    )
+    parser.add_argument("--top-k", type=int, default=DEFAULT_TOP_K, help="Neighbors per image")
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE, help="Rows per matrix product")
+
+    args = parser.parse_args()
+
+    if not DB_URL:
+        print("Error: SUPABASE_DB_URL environment variable not set", file=sys.stderr)
+        sys.exit(1)
+
+    print("Connecting to database...")
+    conn = psycopg2.connect(DB_URL)
+    cursor = conn.cursor()
+
+    cursor.execute("""
+        SELECT image_id, subject, motifs, description
+        FROM images
+        WHERE rank = 1
+        ORDER BY image_id
+    """)
+    rows = cursor.fetchall()
+    print(f"Found {len(rows)} rank-1 images")
+
+    if len(rows) < 2:
+        print("Not enough images to relate")
+        sys.exit(0)
+
+    print("Building TF-IDF vectors...")
+    matrix = build_tfidf(rows)
+    print(f"  {matrix.shape[0]} images x {matrix.shape[1]} terms, {matrix.nnz} nonzeros")
+
+    print("Computing neighbors...")
+    related = top_k_neighbors(matrix, [r[0] for r in rows], args.top_k, args.chunk_size)
+
+    print(f"Loading {len(related)} rows into related_images...")
+    load_related(cursor, related)
+    conn.commit()
+
+    cursor.close()
+    conn.close()
+
+    print("\n✅ Done!")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,179 @@
+#!/usr/bin/env python3
+"""
+Build the search vocabulary used by fuzzy search.
+
+Extracts every distinct word from subject, motifs and description of the
+rank-1 images, weights each occurrence like search_vector does (subject A,
+motifs and description B), and replaces the contents of search_terms with
+one row per term including its document postings.
+
+The vocabulary is only rebuilt when the indexed text has changed since the
+last build (rank-1 row count or an MD5 over subject, motifs and description),
+so this can run on a schedule. Updates to other columns, such as placeholders
+or Cloudflare IDs, do not trigger a rebuild.
+
+Usage:
+    python scripts/build_search_vocabulary.py [--force]
+
+Environment variables:
+    SUPABASE_DB_URL: Postgres connection string for the Supabase database
+
+Output:
+    Refreshes the search_terms table (see 005_search_vocabulary.sql) and
+    clears search_cache (see 008_search_cache.sql), whose results were
+    computed with the previous query expansion
+"""
+
+import argparse
+import os
+import re
+import sys
+from collections import defaultdict
+from typing import Dict, Iterable, List, Set, Tuple
+
+import psycopg2
+from psycopg2.extras import execute_values
+
+DB_URL = os.getenv("SUPABASE_DB_URL", "")
+
+# ts_rank default weights for search_vector labels A/B/C/D
+FIELD_WEIGHTS = {
+    "subject": 1.0,      # A
+    "motifs": 0.4,       # B
+    "description": 0.4,  # B
+}
+
+# Must agree with the word split in expand_search_query()
+WORD_PATTERN = re.compile(r"[a-z0-9]+")
+MIN_WORD_LENGTH = 2
+
+
+def tokenize(text: str) -> List[str]:
+    """
+    Split text into lowercase vocabulary words.
+
+    Example:
+        >>> tokenize("Shiva Nataraja, dancing")
+        ['shiva', 'nataraja', 'dancing']
+    """
+    return [w for w in WORD_PATTERN.findall((text or "").lower()) if len(w) >= MIN_WORD_LENGTH]
+
+
+def build_vocabulary(rows: Iterable[Tuple[int, str, str, str]]) -> List[tuple]:
+    """
+    Build weighted terms with postings from image text.
+
+    Args:
+        rows: Iterable of (image_id, subject, motifs, description)
+
+    Returns:
+        List of (term, weight, doc_count, sorted image_ids) tuples
+    """
+    weights: Dict[str, float] = defaultdict(float)
+    postings: Dict[str, Set[int]] = defaultdict(set)
+
+    for image_id, subject, motifs, description in rows:
+        fields = {"subject": subject, "motifs": motifs, "description": description}
+        for field, text in fields.items():
+            for word in tokenize(text):
+                weights[word] += FIELD_WEIGHTS[field]
+                postings[word].add(image_id)
+
+    return [
+        (term, weights[term], len(postings[term]), sorted(postings[term]))
+        for term in sorted(weights)
+    ]
+
+
+def images_signature(cursor) -> Tuple[int, str]:
+    """Return (row count, MD5 of the indexed text) of the rank-1 images."""
+    cursor.execute("""
+        SELECT COUNT(*),
+               md5(COALESCE(string_agg(
+                   image_id || E'\\x1f' || subject || E'\\x1f' || motifs || E'\\x1f' || description,
+                   E'\\x1e' ORDER BY image_id
+               ), ''))
+        FROM images
+        WHERE rank = 1
+    """)
+    return cursor.fetchone()
+
+
+def stored_signature(cursor):
+    """Return the images signature recorded at the last build, if any."""
+    cursor.execute("SELECT image_count, text_md5 FROM search_vocabulary_meta WHERE id = 1")
+    return cursor.fetchone()
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Build the fuzzy search vocabulary",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog=__doc__
+    )
+    parser.add_argument("--force", action="store_true", help="Rebuild even if images are unchanged")
+
+    args = parser.parse_args()
+
+    if not DB_URL:
+        print("Error: SUPABASE_DB_URL environment variable not set", file=sys.stderr)
+        sys.exit(1)
+
+    print("Connecting to database...")
+    conn = psycopg2.connect(DB_URL)
+    cursor = conn.cursor()
+
+    signature = images_signature(cursor)
+    if not args.force and stored_signature(cursor) == signature:
+        print("Image text unchanged since last build, nothing to do")
+        cursor.close()
+        conn.close()
+        return
+
+    print("Reading image text...")
+    cursor.execute("""
+        SELECT image_id, subject, motifs, description
+        FROM images
+        WHERE rank = 1
+    """)
+    rows = cursor.fetchall()
+    print(f"Found {len(rows)} rank-1 images")
+
+    terms = build_vocabulary(rows)
+    print(f"Extracted {len(terms)} terms")
+
+    print("Replacing search_terms...")
+    cursor.execute("DELETE FROM search_terms")
+    execute_values(
+        cursor,
+        "INSERT INTO search_terms (term, weight, doc_count, image_ids) VALUES %s",
+        terms,
+        page_size=1000,
+    )
+    cursor.execute("""
+        INSERT INTO search_vocabulary_meta (id, image_count, text_md5, refreshed_at)
+        VALUES (1, %s, %s, NOW())
+        ON CONFLICT (id) DO UPDATE
+        SET image_count = EXCLUDED.image_count,
+            text_md5 = EXCLUDED.text_md5,
+            refreshed_at = EXCLUDED.refreshed_at
+    """, signature)
+
+    cursor.execute("SELECT to_regclass('search_cache') IS NOT NULL")
+    if cursor.fetchone()[0]:
+        cursor.execute("DELETE FROM search_cache")
+        print(f"Cleared {cursor.rowcount} cached search pages")
+    conn.commit()
+
+    print("\nTop terms by weight:")
+    for term, weight, doc_count, _ in sorted(terms, key=lambda t: -t[1])[:10]:
+        print(f"  {term:20s} {weight:8.1f}  ({doc_count} images)")
+
+    cursor.close()
+    conn.close()
+
+    print(f"\n✅ Vocabulary rebuilt with {len(terms)} terms")
+
+
+if __name__ == "__main__":
+    main()
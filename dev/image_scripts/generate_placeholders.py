@@ -0,0 +1,244 @@
+#!/usr/bin/env python3
+"""
+Generate low-quality image placeholders (LQIP) for all images.
+
+Computes, for every row in the images table, an average color, the aspect
+ratio and a tiny blurred WebP preview from the local derivatives (caves_thumbs, falling back
+to caves_1200px). Work is spread across a process pool. Images whose source
+file is unchanged since the last run (same SHA-1) are skipped.
+
+Usage:
+    python scripts/generate_placeholders.py <images_root> [--workers N] [--force]
+
+Example:
+    python scripts/generate_placeholders.py ./images
+
+Arguments:
+    images_root : Directory containing caves_thumbs/ and caves_1200px/
+
+Environment variables:
+    SUPABASE_DB_URL: Postgres connection string for the Supabase database
+
+Output:
+    Updates placeholder_color, placeholder_lqip, placeholder_aspect and
+    placeholder_hash in the images table (see 004_image_placeholders.sql), and
+    writes placeholders.json mapping image_id -> {color, lqip, aspect} for the
+    exported data.
+"""
+
+import argparse
+import base64
+import hashlib
+import io
+import json
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import psycopg2
+from psycopg2.extras import execute_values
+from PIL import Image, ImageOps
+
+DB_URL = os.getenv("SUPABASE_DB_URL", "")
+DERIVATIVE_DIRS = ("caves_thumbs", "caves_1200px")
+LQIP_WIDTH = 16      # pixels; upscaled and blurred by the browser
+LQIP_QUALITY = 40
+BATCH_SIZE = 500     # rows per UPDATE statement
+ORIENTATION_TAG = 0x0112
+
+
+def find_source(images_root: Path, file_path: str, thumbnail: Optional[str]) -> Optional[Path]:
+    """
+    Find the smallest local derivative for an image.
+
+    Args:
+        images_root: Directory containing the derivative folders
+        file_path: Database file path (e.g., "c16/c16_F1.jpg")
+        thumbnail: Database thumbnail path, if any
+
+    Returns:
+        Path to the first existing derivative, or None
+    """
+    candidates = []
+    if thumbnail:
+        candidates.append(images_root / "caves_thumbs" / thumbnail)
+    for directory in DERIVATIVE_DIRS:
+        candidates.append(images_root / directory / file_path)
+
+    for candidate in candidates:
+        if candidate.is_file():
+            return candidate
+    return None
+
+
+def file_sha1(path: Path) -> str:
+    """Return the hex SHA-1 of a file's contents."""
+    digest = hashlib.sha1()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(65536), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def compute_placeholder(task: Tuple[int, str]) -> Tuple[int, str, str, float]:
+    """
+    Compute the placeholder for one image (runs in a worker process).
+
+    Args:
+        task: Tuple of (image_id, source path)
+
+    Returns:
+        Tuple of (image_id, "#rrggbb" average color, data: URI of a tiny WebP,
+        width / height), or (image_id, "", error message, 0.0) if the image
+        could not be read
+    """
+    image_id, source = task
+
+    try:
+        with Image.open(source) as img:
+            # Browsers render <img> with EXIF orientation applied, so
+            # measure and preview the upright image
+            width, height = img.size
+            if img.getexif().get(ORIENTATION_TAG, 1) in (5, 6, 7, 8):
+                width, height = height, width
+            aspect = width / height
+            img.draft("RGB", (LQIP_WIDTH * 4, LQIP_WIDTH * 4))
+            img = ImageOps.exif_transpose(img).convert("RGB")
+            height = max(1, round(img.height * LQIP_WIDTH / img.width))
+            small = img.resize((LQIP_WIDTH, height), Image.LANCZOS)
+    except Exception as e:
+        return image_id, "", str(e), 0.0
+
+    r, g, b = small.resize((1, 1), Image.BOX).getpixel((0, 0))
+    color = f"#{r:02x}{g:02x}{b:02x}"
+
+    buffer = io.BytesIO()
+    small.save(buffer, format="WEBP", quality=LQIP_QUALITY)
+    lqip = "data:image/webp;base64," + base64.b64encode(buffer.getvalue()).decode("ascii")
+
+    return image_id, color, lqip, round(aspect, 4)
+
+
+def fetch_images(cursor) -> List[tuple]:
+    """Fetch the columns needed to locate and diff every image."""
+    cursor.execute("""
+        SELECT image_id, file_path, thumbnail,
+               placeholder_hash, placeholder_color, placeholder_lqip, placeholder_aspect
+        FROM images
+        ORDER BY image_id
+    """)
+    return cursor.fetchall()
+
+
+def write_placeholders(cursor, rows: List[Tuple[int, str, str, float, str]]):
+    """
+    Bulk-update placeholder columns.
+
+    Args:
+        cursor: psycopg2 cursor
+        rows: List of (image_id, color, lqip, aspect, source hash)
+    """
+    execute_values(
+        cursor,
+        """
+        UPDATE images AS i
+        SET placeholder_color = v.color,
+            placeholder_lqip = v.lqip,
+            placeholder_aspect = v.aspect,
+            placeholder_hash = v.hash
+        FROM (VALUES %s) AS v(image_id, color, lqip, aspect, hash)
+        WHERE i.image_id = v.image_id
+        """,
+        rows,
+        page_size=BATCH_SIZE,
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Generate low-quality image placeholders",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog=__doc__
+    )
+    parser.add_argument("images_root", type=Path, help="Directory containing image derivatives")
+    parser.add_argument("--workers", type=int, default=os.cpu_count(), help="Worker processes")
+    parser.add_argument("--force", action="store_true", help="Recompute even if unchanged")
+    parser.add_argument("--output", type=Path, default=Path("placeholders.json"), help="Export file")
+
+    args = parser.parse_args()
+
+    if not DB_URL:
+        print("Error: SUPABASE_DB_URL environment variable not set", file=sys.stderr)
+        sys.exit(1)
+
+    if not args.images_root.is_dir():
+        print(f"Error: '{args.images_root}' is not a directory", file=sys.stderr)
+        sys.exit(1)
+
+    print("Connecting to database...")
+    conn = psycopg2.connect(DB_URL)
+    cursor = conn.cursor()
+
+    images = fetch_images(cursor)
+    print(f"Found {len(images)} images in database")
+
+    exported: Dict[int, dict] = {}
+    tasks = []
+    hashes: Dict[int, str] = {}
+    missing = 0
+
+    for image_id, file_path, thumbnail, old_hash, color, lqip, aspect in images:
+        source = find_source(args.images_root, file_path, thumbnail)
+        if source is None:
+            missing += 1
+            if missing <= 10:
+                print(f"Warning: No local derivative for: {file_path}")
+            continue
+
+        source_hash = file_sha1(source)
+        if not args.force and source_hash == old_hash and color and lqip and aspect:
+            exported[image_id] = {"color": color, "lqip": lqip, "aspect": aspect}
+            continue
+
+        hashes[image_id] = source_hash
+        tasks.append((image_id, str(source)))
+
+    print(f"Unchanged: {len(exported)}, to compute: {len(tasks)}, missing: {missing}")
+
+    updates = []
+    failed = 0
+    if tasks:
+        with ProcessPoolExecutor(max_workers=args.workers) as pool:
+            results = pool.map(compute_placeholder, tasks, chunksize=32)
+            for idx, (image_id, color, lqip, aspect) in enumerate(results, 1):
+                if not color:
+                    failed += 1
+                    print(f"  Error computing placeholder for image {image_id}: {lqip}")
+                    continue
+                updates.append((image_id, color, lqip, aspect, hashes[image_id]))
+                exported[image_id] = {"color": color, "lqip": lqip, "aspect": aspect}
+                if idx % 500 == 0:
+                    print(f"  [{idx}/{len(tasks)}]")
+
+    if updates:
+        print(f"Writing {len(updates)} placeholders to database...")
+        write_placeholders(cursor, updates)
+        conn.commit()
+
+    cursor.close()
+    conn.close()
+
+    with open(args.output, "w") as f:
+        json.dump({str(k): v for k, v in sorted(exported.items())}, f, separators=(",", ":"))
+
+    print(f"\nResults:")
+    print(f"  Updated:  {len(updates)}")
+    print(f"  Failed:   {failed}")
+    print(f"  Exported: {len(exported)} -> {args.output}")
+    print("\n✅ Done!")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,296 @@
+#!/usr/bin/env python3
+"""
+Generate Deep Zoom (DZI) tile pyramids for floor plans.
+
+For every 480px floor plan in frontend/public/plans/, finds the matching
+high-resolution source (same name without "_480px", any image extension)
+and cuts it into a DZI tile pyramid. Variants ending in "_invert" with no
+source of their own are rendered by inverting the base plan's source.
+Plans whose source is unchanged since the last run (same SHA-1) are skipped.
+
+Usage:
+    python scripts/generate_plan_tiles.py <source_dir> <output_dir> [--base-url URL] [--plans-dir DIR] [--force]
+
+Example:
+    python scripts/generate_plan_tiles.py ./plans_highres ./plan_tiles --base-url https://tiles.elloracaves.org
+    rclone sync ./plan_tiles r2:plan-tiles
+
+Arguments:
+    source_dir : Directory containing high-resolution plan images
+    output_dir : Directory to write pyramids and manifest to
+
+Output:
+    <output_dir>/<name>.dzi
+    <output_dir>/<name>_files/<level>/<col>_<row>.jpg
+    <output_dir>/manifest.json
+
+    The manifest maps each plans.plan_image to its pyramid, with URLs under
+    --base-url (relative to the manifest by default). Tiles cover the same
+    crop as the 480px plan, so a marker at (plan_x_norm, plan_y_norm) sits at
+    pixel (plan_x_norm * width, plan_y_norm * height) of the pyramid. Plans
+    whose source has a different aspect ratio than the 480px plan would not
+    line up, so they are counted as failed and left out of the manifest.
+
+Hosting:
+    A deep pyramid has thousands of tiles per plan. Upload output_dir to R2
+    or another CDN rather than frontend/public/: a Cloudflare Pages deployment
+    is limited to 20,000 files, and the script reports the total
+    tile count against it.
+"""
+
+import argparse
+import hashlib
+import json
+import math
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+from PIL import Image, ImageOps
+
+Image.MAX_IMAGE_PIXELS = None  # high-resolution plans exceed the default guard
+
+REPO_ROOT = Path(__file__).resolve().parents[2]
+PLANS_DIR = REPO_ROOT / "frontend" / "public" / "plans"
+PREVIEW_SUFFIX = "_480px"
+INVERT_SUFFIX = "_invert"
+SOURCE_EXTENSIONS = (".tif", ".tiff", ".png", ".jpg", ".jpeg")
+TILE_SIZE = 254
+TILE_OVERLAP = 1
+TILE_FORMAT = "jpg"
+TILE_QUALITY = 85
+ASPECT_TOLERANCE = 0.01  # relative difference allowed between preview and source
+PAGES_FILE_LIMIT = 20000  # files per Cloudflare Pages deployment
+
+
+def source_stem(plan_image: str) -> str:
+    """
+    Derive the high-resolution source name from a 480px plan file name.
+
+    Example:
+        >>> source_stem("plan16_floor1_triplestory_rotate_crop_480px.jpg")
+        'plan16_floor1_triplestory_rotate_crop'
+    """
+    return Path(plan_image).stem.replace(PREVIEW_SUFFIX, "")
+
+
+def find_source(source_dir: Path, plan_image: str) -> Tuple[Optional[Path], bool]:
+    """
+    Find the high-resolution source for a plan.
+
+    Args:
+        source_dir: Directory containing high-resolution plans
+        plan_image: 480px plan file name (as stored in plans.plan_image)
+
+    Returns:
+        Tuple of (source path or None, whether the source must be inverted)
+    """
+    stem = source_stem(plan_image)
+    candidates = [(stem, False)]
+    if stem.endswith(INVERT_SUFFIX):
+        candidates.append((stem[:-len(INVERT_SUFFIX)], True))
+
+    for name, invert in candidates:
+        for ext in SOURCE_EXTENSIONS:
+            for candidate in (source_dir / f"{name}{ext}", source_dir / f"{name}{ext.upper()}"):
+                if candidate.is_file():
+                    return candidate, invert
+    return None, False
+
+
+def file_sha1(path: Path) -> str:
+    """Return the hex SHA-1 of a file's contents."""
+    digest = hashlib.sha1()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(65536), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def build_pyramid(task: Tuple[str, str, bool, str]) -> Tuple[str, dict, str]:
+    """
+    Cut one plan into a DZI tile pyramid (runs in a worker process).
+
+    Level N (the top) is the source at full resolution; each level below is
+    half the size of the one above, down to level 0 at 1x1 pixel.
+
+    Args:
+        task: Tuple of (plan_image, source path, invert, output directory)
+
+    Returns:
+        Tuple of (plan_image, manifest entry without URLs, error message).
+        The entry is empty and the error set if the plan could not be tiled.
+    """
+    plan_image, source, invert, output_dir = task
+    stem = Path(plan_image).stem
+    tiles_dir = Path(output_dir) / f"{stem}_files"
+
+    try:
+        with Image.open(source) as img:
+            img = img.convert("L" if img.mode in ("1", "L", "LA") else "RGB")
+        if invert:
+            img = ImageOps.invert(img)
+
+        width, height = img.size
+        max_level = math.ceil(math.log2(max(width, height)))
+
+        tile_count = 0
+        level_image = img
+        for level in range(max_level, -1, -1):
+            level_dir = tiles_dir / str(level)
+            level_dir.mkdir(parents=True, exist_ok=True)
+            level_width, level_height = level_image.size
+
+            for col in range(math.ceil(level_width / TILE_SIZE)):
+                for row in range(math.ceil(level_height / TILE_SIZE)):
+                    left = max(0, col * TILE_SIZE - TILE_OVERLAP)
+                    top = max(0, row * TILE_SIZE - TILE_OVERLAP)
+                    right = min(level_width, (col + 1) * TILE_SIZE + TILE_OVERLAP)
+                    bottom = min(level_height, (row + 1) * TILE_SIZE + TILE_OVERLAP)
+                    tile = level_image.crop((left, top, right, bottom))
+                    tile.save(level_dir / f"{col}_{row}.{TILE_FORMAT}", quality=TILE_QUALITY)
+                    tile_count += 1
+
+            next_size = (max(1, math.ceil(level_width / 2)), max(1, math.ceil(level_height / 2)))
+            level_image = level_image.resize(next_size, Image.LANCZOS)
+    except Exception as e:
+        return plan_image, {}, str(e)
+
+    with open(Path(output_dir) / f"{stem}.dzi", "w") as f:
+        f.write(
+            '<?xml version="1.0" encoding="UTF-8"?>\n'
+            '<Image xmlns="http://schemas.microsoft.com/deepzoom/2008" '
+            f'TileSize="{TILE_SIZE}" Overlap="{TILE_OVERLAP}" Format="{TILE_FORMAT}">\n'
+            f'  <Size Width="{width}" Height="{height}"/>\n'
+            '</Image>\n'
+        )
+
+    entry = {
+        "width": width,
+        "height": height,
+        "tile_size": TILE_SIZE,
+        "overlap": TILE_OVERLAP,
+        "format": TILE_FORMAT,
+        "max_level": max_level,
+        "tile_count": tile_count,
+    }
+    return plan_image, entry, ""
+
+
+def with_urls(plan_image: str, entry: dict, base_url: str) -> dict:
+    """
+    Set the pyramid URLs of a manifest entry under base_url.
+
+    URLs are derived at write time, so changing --base-url does not
+    require re-tiling.
+    """
+    stem = Path(plan_image).stem
+    prefix = f"{base_url.rstrip('/')}/" if base_url else ""
+    return {**entry, "dzi": f"{prefix}{stem}.dzi", "tiles": f"{prefix}{stem}_files"}
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Generate Deep Zoom tile pyramids for floor plans",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog=__doc__
+    )
+    parser.add_argument("source_dir", type=Path, help="Directory containing high-resolution plans")
+    parser.add_argument("output_dir", type=Path, help="Directory to write pyramids and manifest to")
+    parser.add_argument("--base-url", default="", help="URL output_dir is served from (default: relative)")
+    parser.add_argument("--plans-dir", type=Path, default=PLANS_DIR, help="Directory of 480px plans")
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes")
+    parser.add_argument("--force", action="store_true", help="Re-tile even if unchanged")
+
+    args = parser.parse_args()
+
+    if not args.source_dir.is_dir():
+        print(f"Error: '{args.source_dir}' is not a directory", file=sys.stderr)
+        sys.exit(1)
+
+    output_dir = args.output_dir
+    output_dir.mkdir(parents=True, exist_ok=True)
+    manifest_path = output_dir / "manifest.json"
+
+    manifest: Dict[str, dict] = {}
+    if manifest_path.exists():
+        with open(manifest_path) as f:
+            manifest = json.load(f)
+
+    plans = sorted(p for p in args.plans_dir.glob(f"*{PREVIEW_SUFFIX}*") if p.is_file())
+    print(f"Found {len(plans)} floor plan(s) in {args.plans_dir}")
+
+    tasks = []
+    previews: Dict[str, Tuple[int, int]] = {}
+    hashes: Dict[str, str] = {}
+    inverted: Dict[str, bool] = {}
+    missing = 0
+
+    for plan in plans:
+        source, invert = find_source(args.source_dir, plan.name)
+        if source is None:
+            missing += 1
+            print(f"Warning: No high-resolution source for: {plan.name}")
+            continue
+
+        source_hash = file_sha1(source)
+        previous = manifest.get(plan.name, {})
+        if (not args.force and previous.get("source_sha1") == source_hash
+                and previous.get("inverted", False) == invert):
+            continue
+
+        with Image.open(plan) as preview:
+            previews[plan.name] = preview.size
+        hashes[plan.name] = source_hash
+        inverted[plan.name] = invert
+        tasks.append((plan.name, str(source), invert, str(output_dir)))
+
+    print(f"To tile: {len(tasks)}, unchanged: {len(plans) - len(tasks) - missing}, missing: {missing}")
+
+    failed = 0
+    with ProcessPoolExecutor(max_workers=args.workers) as pool:
+        for plan_image, entry, error in pool.map(build_pyramid, tasks):
+            if error:
+                failed += 1
+                print(f"  ✗ {plan_image}: {error}")
+                continue
+
+            preview_width, preview_height = previews[plan_image]
+            preview_aspect = preview_width / preview_height
+            source_aspect = entry["width"] / entry["height"]
+            if abs(source_aspect - preview_aspect) / preview_aspect > ASPECT_TOLERANCE:
+                failed += 1
+                manifest.pop(plan_image, None)
+                print(f"  ✗ {plan_image}: source aspect {source_aspect:.4f} differs from "
+                      f"480px plan {preview_aspect:.4f}; plan_x_norm/plan_y_norm would not line up")
+                continue
+
+            entry["plan_width"] = preview_width
+            entry["plan_height"] = preview_height
+            entry["source_sha1"] = hashes[plan_image]
+            entry["inverted"] = inverted[plan_image]
+            manifest[plan_image] = entry
+            print(f"  ✓ {plan_image}: {entry['width']}x{entry['height']}, "
+                  f"{entry['max_level'] + 1} levels, {entry['tile_count']} tiles")
+
+    manifest = {name: with_urls(name, entry, args.base_url) for name, entry in sorted(manifest.items())}
+    with open(manifest_path, "w") as f:
+        json.dump(manifest, f, indent=2)
+
+    # Tiles, one .dzi per plan and the manifest
+    total_files = sum(entry.get("tile_count", 0) + 1 for entry in manifest.values()) + 1
+
+    print(f"\nResults:")
+    print(f"  Tiled:    {len(tasks) - failed}")
+    print(f"  Failed:   {failed}")
+    print(f"  Manifest: {manifest_path} ({len(manifest)} plans)")
+    print(f"  Files:    {total_files}")
+    if total_files > PAGES_FILE_LIMIT:
+        print(f"\nWarning: {total_files} files exceed the Cloudflare Pages limit of "
+              f"{PAGES_FILE_LIMIT}; serve {output_dir} from R2 or another CDN")
+    print("\n✅ Done!")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,150 @@
+#!/usr/bin/env python3
+"""
+Precompute search results for the most frequent queries.
+
+Reads search_query_log, picks the most frequent normalized queries per cave
+filter over a recent window, and stores their first result pages in
+search_cache, where search_images_cached() serves them with a single
+primary-key lookup. Entries for queries that are no longer popular are
+dropped, and log rows older than the retention period are deleted.
+
+Each query is recomputed in its own short transaction holding a SHARE lock
+on images. Writers wait until it commits, so the invalidation trigger on
+images always sees the refreshed pages, and none are computed from a
+snapshot that an update has since made stale.
+
+Run on a schedule (e.g. nightly cron).
+
+Usage:
+    python scripts/refresh_search_cache.py [--top N] [--pages P] [--days D]
+
+Environment variables:
+    SUPABASE_DB_URL: Postgres connection string for the Supabase database
+
+Output:
+    Refreshes the search_cache table (see 008_search_cache.sql)
+"""
+
+import argparse
+import os
+import sys
+
+import psycopg2
+
+DB_URL = os.getenv("SUPABASE_DB_URL", "")
+DEFAULT_TOP = 300        # queries to cache
+DEFAULT_PAGES = 3        # result pages per query
+DEFAULT_DAYS = 30        # window of the log to rank queries by
+MIN_COUNT = 3            # ignore queries searched fewer times than this
+PAGE_SIZE = 20           # must match the page size the frontend requests
+LOG_RETENTION_DAYS = 180
+
+
+def popular_queries(cursor, top: int, days: int):
+    """
+    Return the most frequent (query, cave filter) pairs in the log.
+
+    Args:
+        cursor: psycopg2 cursor
+        top: Maximum number of pairs
+        days: Only count searches from this many recent days
+
+    Returns:
+        List of (query_norm, cave_key, count), most frequent first
+    """
+    cursor.execute("""
+        SELECT query_norm, COALESCE(cave_id, 0) AS cave_key, COUNT(*) AS n
+        FROM search_query_log
+        WHERE searched_at > NOW() - make_interval(days => %s)
+          AND page_num = 1
+        GROUP BY query_norm, COALESCE(cave_id, 0)
+        HAVING COUNT(*) >= %s
+        ORDER BY n DESC, query_norm
+        LIMIT %s
+    """, (days, MIN_COUNT, top))
+    return cursor.fetchall()
+
+
+def cache_query(cursor, query_norm: str, cave_key: int, pages: int):
+    """
+    Store the first result pages of one query in search_cache.
+
+    Pages past the last result are not stored. Commits when done; see the
+    module docstring for why images is locked meanwhile.
+    """
+    cursor.execute("LOCK TABLE images IN SHARE MODE")
+    cursor.execute(
+        "DELETE FROM search_cache WHERE query_norm = %s AND cave_key = %s AND page_size = %s",
+        (query_norm, cave_key, PAGE_SIZE),
+    )
+
+    for page in range(1, pages + 1):
+        cursor.execute("""
+            INSERT INTO search_cache (query_norm, cave_key, page_num, page_size, results, image_ids, cached_at)
+            SELECT %(query)s, %(cave_key)s, %(page)s, %(page_size)s,
+                   COALESCE(jsonb_agg(to_jsonb(r) ORDER BY r.relevance DESC, r.file_path), '[]'::jsonb),
+                   COALESCE(array_agg(r.image_id), '{}'),
+                   NOW()
+            FROM search_images_fuzzy(%(query)s, NULLIF(%(cave_key)s, 0), %(page)s, %(page_size)s, TRUE) r
+            HAVING COUNT(*) > 0 OR %(page)s = 1
+        """, {"query": query_norm, "cave_key": cave_key, "page": page, "page_size": PAGE_SIZE})
+
+        if cursor.rowcount == 0:
+            break
+
+    cursor.connection.commit()
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Precompute results of popular searches",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog=__doc__
+    )
+    parser.add_argument("--top", type=int, default=DEFAULT_TOP, help="Number of queries to cache")
+    parser.add_argument("--pages", type=int, default=DEFAULT_PAGES, help="Result pages per query")
+    parser.add_argument("--days", type=int, default=DEFAULT_DAYS, help="Days of log to consider")
+
+    args = parser.parse_args()
+
+    if not DB_URL:
+        print("Error: SUPABASE_DB_URL environment variable not set", file=sys.stderr)
+        sys.exit(1)
+
+    print("Connecting to database...")
+    conn = psycopg2.connect(DB_URL)
+    cursor = conn.cursor()
+
+    queries = popular_queries(cursor, args.top, args.days)
+    print(f"Found {len(queries)} popular queries in the last {args.days} days")
+
+    for idx, (query_norm, cave_key, count) in enumerate(queries, 1):
+        scope = f"cave {cave_key}" if cave_key else "all caves"
+        print(f"[{idx}/{len(queries)}] {query_norm!r} ({scope}, {count} searches)")
+        cache_query(cursor, query_norm, cave_key, args.pages)
+
+    # Drop entries for queries that fell out of the popular set
+    keys = [(q, c) for q, c, _ in queries] or [("", -1)]
+    cursor.execute("""
+        DELETE FROM search_cache
+        WHERE (query_norm, cave_key) NOT IN %s
+           OR page_size <> %s
+           OR page_num > %s
+    """, (tuple(keys), PAGE_SIZE, args.pages))
+    print(f"\nRemoved {cursor.rowcount} stale cache entries")
+
+    cursor.execute(
+        "DELETE FROM search_query_log WHERE searched_at < NOW() - make_interval(days => %s)",
+        (LOG_RETENTION_DAYS,),
+    )
+    print(f"Pruned {cursor.rowcount} log rows older than {LOG_RETENTION_DAYS} days")
+
+    conn.commit()
+    cursor.close()
+    conn.close()
+
+    print("\n✅ Done!")
+
+
+if __name__ == "__main__":
+    main()
@@ -5,6 +5,10 @@ Sync Cloudflare Images IDs to Supabase database.
 Fetches all images from Cloudflare Images API, matches them to database
 records by filename, and updates the cloudflare_image_id column.
 
+Only needed for images uploaded with Cloudflare-assigned random IDs. Images
+uploaded with upload_cloudflare.py --custom-ids are backfilled directly by
+backfill_custom_ids.sql.
+
 Usage:
     python scripts/sync_cloudflare_ids.py
 
@@ -5,6 +5,10 @@ Update Supabase database with Cloudflare Images IDs.
 This script reads the upload_log.csv generated by upload_cloudflare.py
 and updates the Supabase database with the corresponding Cloudflare image IDs.
 
+Only needed for images uploaded with Cloudflare-assigned random IDs. Images
+uploaded with upload_cloudflare.py --custom-ids are backfilled directly by
+backfill_custom_ids.sql.
+
 Usage:
     python scripts/update_image_ids.py <upload_log.csv> [--supabase-url URL] [--supabase-key KEY]
 
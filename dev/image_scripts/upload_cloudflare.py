@@ -5,17 +5,27 @@ Cloudflare Images Bulk Upload
 Recursively uploads all image files from a directory tree to Cloudflare Images API.
 
 Usage:
-    python upload_cloudflare.py <directory> <api_token>
+    python upload_cloudflare.py <directory> <api_token> [--custom-ids] [--id-prefix PREFIX] [--log-prefix PREFIX]
 
 Example:
     python upload_cloudflare.py ./images RWUGNIHKQloCEfkhttgCcaKnb_4bSSmeof-VPgfp
+    python upload_cloudflare.py ./caves_1200px $CF_API_TOKEN --custom-ids --log-prefix upload_1200px
+    python upload_cloudflare.py ./caves_thumbs $CF_API_TOKEN --custom-ids --id-prefix thumbs/ --log-prefix upload_thumbs
 
 Arguments:
     directory  : Root directory containing images to upload
     api_token  : Cloudflare API token with Images write permission
 
+Custom IDs:
+    With --custom-ids, each image is uploaded under an ID equal to its path
+    relative to <directory> (e.g. "c16/c16_F1.jpg"), optionally prefixed.
+    Uploading from caves_1200px/ makes the ID equal images.file_path, so
+    no listing or filename matching is needed afterwards: backfill_custom_ids.sql
+    sets the IDs from the SUCCESS rows of the upload logs. Re-running is safe:
+    images that already exist under their ID are logged as SUCCESS.
+
 Output:
-    Creates two log files:
+    Creates two log files (prefix set with --log-prefix, default "upload"):
     - upload_log.csv: Complete record of all uploads with timestamps and IDs
     - upload_errors.csv: Failed uploads with error messages
 """
@@ -26,7 +36,7 @@ import sys
 import time
 from datetime import datetime
 from pathlib import Path
-from typing import Tuple, List
+from typing import Tuple, List, Optional
 
 import requests
 
@@ -35,6 +45,7 @@ ACCOUNT_ID = "4e65b8f97b6c2c3f485dcda82c179275"
 API_ENDPOINT = f"https://api.cloudflare.com/client/v4/accounts/{ACCOUNT_ID}/images/v1"
 IMAGE_EXTENSIONS = {".jpg", ".jpeg", ".png", ".gif", ".webp", ".bmp", ".svg"}
 RATE_LIMIT_DELAY = 0.3  # seconds between uploads (1200 per 5 min = 4/sec max)
+ALREADY_EXISTS_CODE = 5409  # Cloudflare error code for a duplicate custom ID
 
 
 def find_images(directory: Path) -> List[Path]:
@@ -59,10 +70,29 @@ def find_images(directory: Path) -> List[Path]:
     return sorted(images)
 
 
+def custom_image_id(relative_path: Path, prefix: str = "") -> str:
+    """
+    Derive a stable Cloudflare custom ID from an image's relative path.
+    
+    Args:
+        relative_path: Path relative to the upload root
+        prefix: Optional prefix to keep derivative sets apart (e.g., "thumbs/")
+        
+    Returns:
+        Custom ID string using forward slashes
+        
+    Example:
+        >>> custom_image_id(Path("c16/c16_F1.jpg"))
+        'c16/c16_F1.jpg'
+    """
+    return f"{prefix}{relative_path.as_posix()}"
+
+
 def upload_image(
     file_path: Path, 
     api_token: str,
-    timeout: int = 120
+    timeout: int = 120,
+    custom_id: Optional[str] = None
 ) -> Tuple[bool, str, str]:
     """
     Upload a single image to Cloudflare Images.
@@ -71,6 +101,9 @@ def upload_image(
         file_path: Path to image file
         api_token: Cloudflare API token
         timeout: Request timeout in seconds
+        custom_id: Custom image ID to upload under; Cloudflare assigns a
+            random ID if omitted. An existing image with this ID counts
+            as success.
         
     Returns:
         Tuple of (success, image_id, error_message)
@@ -90,14 +123,19 @@ def upload_image(
         with open(file_path, "rb") as f:
             files = {"file": (file_path.name, f)}
             headers = {"Authorization": f"Bearer {api_token}"}
+            data = {"id": custom_id} if custom_id else None
             
             response = requests.post(
                 API_ENDPOINT,
                 files=files,
+                data=data,
                 headers=headers,
                 timeout=timeout
             )
             
+            if custom_id and _already_exists(response):
+                return True, custom_id, ""
+            
             if response.status_code == 200:
                 data = response.json()
                 if data.get("success"):
@@ -118,6 +156,18 @@ def upload_image(
         return False, "", str(e)
 
 
+def _already_exists(response: requests.Response) -> bool:
+    """Return True if Cloudflare rejected an upload because its ID is taken."""
+    try:
+        errors = response.json().get("errors", [])
+    except ValueError:
+        return False
+    return any(
+        e.get("code") == ALREADY_EXISTS_CODE or "already exists" in e.get("message", "").lower()
+        for e in errors
+    )
+
+
 def main():
     """
     Main execution function for bulk image upload.
@@ -132,6 +182,9 @@ def main():
     )
     parser.add_argument("directory", type=Path, help="Directory containing images")
     parser.add_argument("api_token", help="Cloudflare API token")
+    parser.add_argument("--custom-ids", action="store_true", help="Upload under path-derived custom IDs")
+    parser.add_argument("--id-prefix", default="", help="Prefix for custom IDs (e.g., thumbs/)")
+    parser.add_argument("--log-prefix", default="upload", help="Prefix for the log file names")
     
     args = parser.parse_args()
     
@@ -152,8 +205,11 @@ def main():
     success_count = 0
     failed_count = 0
     
-    with open("upload_log.csv", "w", newline="") as log_file, \
-         open("upload_errors.csv", "w", newline="") as error_file:
+    log_path = f"{args.log_prefix}_log.csv"
+    error_path = f"{args.log_prefix}_errors.csv"
+    
+    with open(log_path, "w", newline="") as log_file, \
+         open(error_path, "w", newline="") as error_file:
         
         log_writer = csv.writer(log_file)
         error_writer = csv.writer(error_file)
@@ -165,7 +221,10 @@ def main():
             relative_path = image_path.relative_to(args.directory)
             print(f"[{idx}/{total}] {relative_path} ... ", end="", flush=True)
             
-            success, image_id, error_msg = upload_image(image_path, args.api_token)
+            custom_id = custom_image_id(relative_path, args.id_prefix) if args.custom_ids else None
+            success, image_id, error_msg = upload_image(
+                image_path, args.api_token, custom_id=custom_id
+            )
             timestamp = datetime.now().isoformat()
             
             if success:
@@ -190,8 +249,8 @@ def main():
     print(f"Success:    {success_count}")
     print(f"Failed:     {failed_count}")
     print(f"\nLogs:")
-    print(f"  - upload_log.csv")
-    print(f"  - upload_errors.csv")
+    print(f"  - {log_path}")
+    print(f"  - {error_path}")
 
 
 if __name__ == "__main__":
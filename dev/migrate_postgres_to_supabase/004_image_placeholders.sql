@@ -0,0 +1,16 @@
+-- Low-quality image placeholders (LQIP)
+-- Migration: 004_image_placeholders
+--
+-- Populated in batch by dev/image_scripts/generate_placeholders.py.
+-- Pages render these inline while the Cloudflare variant loads,
+-- so placeholders cost no extra requests.
+
+ALTER TABLE images ADD COLUMN IF NOT EXISTS placeholder_color VARCHAR(7);
+ALTER TABLE images ADD COLUMN IF NOT EXISTS placeholder_lqip TEXT;
+ALTER TABLE images ADD COLUMN IF NOT EXISTS placeholder_aspect REAL;
+ALTER TABLE images ADD COLUMN IF NOT EXISTS placeholder_hash VARCHAR(40);
+
+COMMENT ON COLUMN images.placeholder_color IS 'Average color of the image as #rrggbb';
+COMMENT ON COLUMN images.placeholder_lqip IS 'Tiny blurred preview as a data: URI';
+COMMENT ON COLUMN images.placeholder_aspect IS 'Width / height, so the placeholder can be sized before the image loads';
+COMMENT ON COLUMN images.placeholder_hash IS 'SHA-1 of the derivative the placeholder was computed from';
@@ -0,0 +1,184 @@
+-- Corpus vocabulary for index-driven fuzzy search
+-- Migration: 005_search_vocabulary
+--
+-- search_terms holds every distinct word of images.subject, motifs and
+-- description (rank 1 only), populated by dev/image_scripts/build_search_vocabulary.py.
+-- Fuzzy search resolves misspelled query words against this small table
+-- through its trigram index, then matches images with an exact tsquery
+-- through idx_images_search instead of scoring similarity() on every row.
+
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
+
+-- ============================================
+-- TABLES
+-- ============================================
+
+CREATE TABLE IF NOT EXISTS search_terms (
+    term TEXT PRIMARY KEY,
+    weight REAL NOT NULL,
+    doc_count INTEGER NOT NULL,
+    image_ids INTEGER[] NOT NULL
+);
+
+-- Signature of the indexed image text when the vocabulary was last built
+CREATE TABLE IF NOT EXISTS search_vocabulary_meta (
+    id SMALLINT PRIMARY KEY DEFAULT 1 CHECK (id = 1),
+    image_count INTEGER NOT NULL,
+    text_md5 TEXT NOT NULL,
+    refreshed_at TIMESTAMPTZ DEFAULT NOW()
+);
+
+-- ============================================
+-- INDEXES
+-- ============================================
+
+CREATE INDEX IF NOT EXISTS idx_search_terms_trgm ON search_terms USING GIN(term gin_trgm_ops);
+
+-- ============================================
+-- ROW LEVEL SECURITY
+-- ============================================
+
+ALTER TABLE search_terms ENABLE ROW LEVEL SECURITY;
+ALTER TABLE search_vocabulary_meta ENABLE ROW LEVEL SECURITY;
+
+DROP POLICY IF EXISTS "Public read access for search_terms" ON search_terms;
+CREATE POLICY "Public read access for search_terms"
+    ON search_terms FOR SELECT
+    TO anon, authenticated
+    USING (true);
+
+-- ============================================
+-- FUNCTIONS
+-- ============================================
+
+-- Expand each query word into itself plus its closest vocabulary terms.
+-- "shiv natraja" -> (shiv | shiva | siva) & (natraja | nataraja)
+-- Words with no vocabulary match are kept as they are: the vocabulary only
+-- covers subject, motifs and description, while search_vector also indexes
+-- medium and notes. If that leaves no image matching every group,
+-- search_images_fuzzy() retries with match_all = FALSE, which ORs them.
+CREATE OR REPLACE FUNCTION expand_search_query(search_query TEXT, match_all BOOLEAN DEFAULT TRUE)
+RETURNS TSQUERY AS $$
+DECLARE
+    word TEXT;
+    alternatives TEXT[];
+    groups TEXT[] := '{}';
+BEGIN
+    FOR word IN
+        SELECT DISTINCT w
+        FROM regexp_split_to_table(lower(search_query), '[^a-z0-9]+') AS w
+        WHERE length(w) > 1
+    LOOP
+        SELECT array_agg(t.term) INTO alternatives
+        FROM (
+            SELECT st.term
+            FROM search_terms st
+            WHERE st.term % word
+            ORDER BY similarity(st.term, word) DESC, st.weight DESC
+            LIMIT 5
+        ) t;
+
+        groups := groups || (
+            '(' || array_to_string(array_prepend(word, COALESCE(alternatives, '{}')), ' | ') || ')'
+        );
+    END LOOP;
+
+    IF array_length(groups, 1) IS NULL THEN
+        RETURN plainto_tsquery('english', search_query);
+    END IF;
+
+    RETURN to_tsquery(
+        'english',
+        array_to_string(groups, CASE WHEN match_all THEN ' & ' ELSE ' | ' END)
+    );
+END;
+$$ LANGUAGE plpgsql STABLE;
+
+-- Replaces the version from 003_search_function.sql: the fuzzy branch now
+-- matches an expanded tsquery instead of running similarity() per row.
+CREATE OR REPLACE FUNCTION search_images_fuzzy(
+    search_query TEXT,
+    target_cave_id INTEGER DEFAULT NULL,
+    page_num INTEGER DEFAULT 1,
+    page_size INTEGER DEFAULT 20,
+    use_fuzzy BOOLEAN DEFAULT TRUE
+)
+RETURNS TABLE (
+    image_id INTEGER,
+    file_path TEXT,
+    subject TEXT,
+    description TEXT,
+    cave_id INTEGER,
+    plan_id INTEGER,
+    cloudflare_image_id TEXT,
+    cloudflare_thumbnail_id TEXT,
+    thumbnail TEXT,
+    relevance REAL,
+    total_count BIGINT
+) AS $$
+DECLARE
+    skip_count INTEGER := (page_num - 1) * page_size;
+    ts_query TSQUERY;
+    total BIGINT;
+BEGIN
+    IF use_fuzzy THEN
+        ts_query := expand_search_query(search_query);
+    ELSE
+        ts_query := plainto_tsquery('english', search_query);
+    END IF;
+
+    SELECT COUNT(*) INTO total
+    FROM images i
+    WHERE i.rank = 1
+      AND (target_cave_id IS NULL OR i.cave_id = target_cave_id)
+      AND i.search_vector @@ ts_query;
+
+    -- No image has every word: fall back to images matching any of them
+    IF total = 0 AND use_fuzzy THEN
+        ts_query := expand_search_query(search_query, FALSE);
+
+        SELECT COUNT(*) INTO total
+        FROM images i
+        WHERE i.rank = 1
+          AND (target_cave_id IS NULL OR i.cave_id = target_cave_id)
+          AND i.search_vector @@ ts_query;
+    END IF;
+
+    RETURN QUERY
+    SELECT
+        i.image_id,
+        i.file_path::TEXT,
+        i.subject::TEXT,
+        i.description,
+        i.cave_id::INTEGER,
+        i.plan_id::INTEGER,
+        i.cloudflare_image_id::TEXT,
+        i.cloudflare_thumbnail_id::TEXT,
+        i.thumbnail::TEXT,
+        (
+            ts_rank(i.search_vector, ts_query) +
+            COALESCE(similarity(i.subject, search_query), 0) * 2
+        )::REAL as relevance,
+        total as total_count
+    FROM images i
+    WHERE i.rank = 1
+      AND (target_cave_id IS NULL OR i.cave_id = target_cave_id)
+      AND i.search_vector @@ ts_query
+    ORDER BY relevance DESC, i.file_path
+    OFFSET skip_count
+    LIMIT page_size;
+END;
+$$ LANGUAGE plpgsql;
+
+GRANT EXECUTE ON FUNCTION expand_search_query TO anon;
+GRANT EXECUTE ON FUNCTION expand_search_query TO authenticated;
+GRANT EXECUTE ON FUNCTION search_images_fuzzy TO anon;
+GRANT EXECUTE ON FUNCTION search_images_fuzzy TO authenticated;
+
+-- ============================================
+-- COMMENTS
+-- ============================================
+
+COMMENT ON TABLE search_terms IS 'Distinct words of rank-1 image text with weights and postings';
+COMMENT ON COLUMN search_terms.weight IS 'Sum of search_vector field weights over all occurrences';
+COMMENT ON COLUMN search_terms.image_ids IS 'image_id of every rank-1 image containing the term';
@@ -0,0 +1,13 @@
+-- Path-derived Cloudflare Images custom IDs
+-- Migration: 006_custom_cloudflare_ids
+--
+-- Images uploaded with upload_cloudflare.py --custom-ids use their relative
+-- path as the Cloudflare ID (e.g. 'c16/c16_F1.jpg'), which can be longer
+-- than the 64 characters allowed for random IDs. Widen the columns to fit
+-- file_path/thumbnail plus an ID prefix.
+
+ALTER TABLE images ALTER COLUMN cloudflare_image_id TYPE VARCHAR(256);
+ALTER TABLE images ALTER COLUMN cloudflare_thumbnail_id TYPE VARCHAR(256);
+
+COMMENT ON COLUMN images.cloudflare_image_id IS 'Cloudflare Images ID for optimized delivery (equals file_path for custom-ID uploads)';
+COMMENT ON COLUMN images.cloudflare_thumbnail_id IS 'Cloudflare Images ID of the thumbnail (''thumbs/'' || COALESCE(thumbnail, file_path) for custom-ID uploads)';
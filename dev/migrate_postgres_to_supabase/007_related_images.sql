@@ -0,0 +1,42 @@
+-- Precomputed related images
+-- Migration: 007_related_images
+--
+-- Top-k most similar rank-1 images by TF-IDF over subject, motifs and
+-- description, populated by dev/image_scripts/build_related_images.py.
+-- The image detail page reads its neighbors with one indexed query.
+
+-- ============================================
+-- TABLES
+-- ============================================
+
+CREATE TABLE IF NOT EXISTS related_images (
+    image_id INTEGER NOT NULL,
+    position SMALLINT NOT NULL,
+    related_image_id INTEGER NOT NULL,
+    score REAL NOT NULL,
+    PRIMARY KEY (image_id, position),
+    CONSTRAINT related_images_image_id_fkey
+        FOREIGN KEY (image_id) REFERENCES images(image_id) ON DELETE CASCADE,
+    CONSTRAINT related_images_related_image_id_fkey
+        FOREIGN KEY (related_image_id) REFERENCES images(image_id) ON DELETE CASCADE
+);
+
+-- ============================================
+-- ROW LEVEL SECURITY
+-- ============================================
+
+ALTER TABLE related_images ENABLE ROW LEVEL SECURITY;
+
+DROP POLICY IF EXISTS "Public read access for related_images" ON related_images;
+CREATE POLICY "Public read access for related_images"
+    ON related_images FOR SELECT
+    TO anon, authenticated
+    USING (true);
+
+-- ============================================
+-- COMMENTS
+-- ============================================
+
+COMMENT ON TABLE related_images IS 'Most similar images per image by text similarity';
+COMMENT ON COLUMN related_images.position IS '1 = most similar';
+COMMENT ON COLUMN related_images.score IS 'Cosine similarity of TF-IDF vectors';
@@ -0,0 +1,232 @@
+-- Query log and cache of popular search results
+-- Migration: 008_search_cache
+--
+-- search_images_cached() logs every query in normalized form and serves
+-- the first pages of popular queries from search_cache, falling back to
+-- search_images_fuzzy() on a miss. dev/image_scripts/refresh_search_cache.py
+-- reads the log on a schedule and precomputes the most frequent queries.
+-- Changes to images invalidate the cached queries they affect, and
+-- build_search_vocabulary.py clears the cache when it rebuilds search_terms.
+
+-- ============================================
+-- TABLES
+-- ============================================
+
+CREATE TABLE IF NOT EXISTS search_query_log (
+    id BIGSERIAL PRIMARY KEY,
+    query_norm TEXT NOT NULL,
+    cave_id INTEGER,
+    page_num INTEGER NOT NULL DEFAULT 1,
+    searched_at TIMESTAMPTZ DEFAULT NOW()
+);
+
+-- cave_key is 0 for searches across all caves (NULL cannot be in a primary key)
+CREATE TABLE IF NOT EXISTS search_cache (
+    query_norm TEXT NOT NULL,
+    cave_key INTEGER NOT NULL DEFAULT 0,
+    page_num INTEGER NOT NULL,
+    page_size INTEGER NOT NULL,
+    results JSONB NOT NULL,
+    image_ids INTEGER[] NOT NULL,
+    cached_at TIMESTAMPTZ DEFAULT NOW(),
+    PRIMARY KEY (query_norm, cave_key, page_num, page_size)
+);
+
+-- ============================================
+-- INDEXES
+-- ============================================
+
+CREATE INDEX IF NOT EXISTS idx_search_query_log_searched_at ON search_query_log(searched_at);
+CREATE INDEX IF NOT EXISTS idx_search_cache_image_ids ON search_cache USING GIN(image_ids);
+
+-- ============================================
+-- ROW LEVEL SECURITY
+-- ============================================
+
+-- No public policies: both tables are only reached through
+-- search_images_cached(), which runs as its owner.
+ALTER TABLE search_query_log ENABLE ROW LEVEL SECURITY;
+ALTER TABLE search_cache ENABLE ROW LEVEL SECURITY;
+
+-- ============================================
+-- FUNCTIONS
+-- ============================================
+
+-- Lowercase, trim and collapse whitespace so variants share a cache entry
+CREATE OR REPLACE FUNCTION normalize_search_query(search_query TEXT)
+RETURNS TEXT AS $$
+    SELECT regexp_replace(lower(trim(COALESCE(search_query, ''))), '\s+', ' ', 'g');
+$$ LANGUAGE sql IMMUTABLE;
+
+-- Same signature and result as search_images_fuzzy(), with logging and caching
+CREATE OR REPLACE FUNCTION search_images_cached(
+    search_query TEXT,
+    target_cave_id INTEGER DEFAULT NULL,
+    page_num INTEGER DEFAULT 1,
+    page_size INTEGER DEFAULT 20,
+    use_fuzzy BOOLEAN DEFAULT TRUE
+)
+RETURNS TABLE (
+    image_id INTEGER,
+    file_path TEXT,
+    subject TEXT,
+    description TEXT,
+    cave_id INTEGER,
+    plan_id INTEGER,
+    cloudflare_image_id TEXT,
+    cloudflare_thumbnail_id TEXT,
+    thumbnail TEXT,
+    relevance REAL,
+    total_count BIGINT
+) AS $$
+DECLARE
+    max_query_length CONSTANT INTEGER := 200;
+    normalized TEXT := normalize_search_query(search_query);
+    cached JSONB;
+BEGIN
+    IF normalized = '' THEN
+        RETURN;
+    END IF;
+
+    -- Callable by anon: bound what a visitor can write to the log
+    IF length(normalized) > max_query_length THEN
+        RAISE EXCEPTION 'Search query longer than % characters', max_query_length
+            USING ERRCODE = 'string_data_right_truncation';
+    END IF;
+
+    INSERT INTO search_query_log (query_norm, cave_id, page_num)
+    VALUES (left(normalized, max_query_length), target_cave_id, page_num);
+
+    IF use_fuzzy THEN
+        SELECT c.results INTO cached
+        FROM search_cache c
+        WHERE c.query_norm = normalized
+          AND c.cave_key = COALESCE(target_cave_id, 0)
+          AND c.page_num = search_images_cached.page_num
+          AND c.page_size = search_images_cached.page_size;
+
+        IF FOUND THEN
+            RETURN QUERY
+            SELECT r.*
+            FROM jsonb_to_recordset(cached) AS r(
+                image_id INTEGER,
+                file_path TEXT,
+                subject TEXT,
+                description TEXT,
+                cave_id INTEGER,
+                plan_id INTEGER,
+                cloudflare_image_id TEXT,
+                cloudflare_thumbnail_id TEXT,
+                thumbnail TEXT,
+                relevance REAL,
+                total_count BIGINT
+            );
+            RETURN;
+        END IF;
+    END IF;
+
+    RETURN QUERY
+    SELECT * FROM search_images_fuzzy(normalized, target_cave_id, page_num, page_size, use_fuzzy);
+END;
+$$ LANGUAGE plpgsql SECURITY DEFINER SET search_path = public, extensions;
+
+-- Invalidate cache entries affected by a statement on images.
+-- Runs once per statement over its transition tables:
+--   * rows whose text, rank or cave changed (and inserted/deleted rows):
+--     drop every query, all caves and pages, that the old or new version
+--     matches, expanding each cached query once
+--   * rows whose displayed fields changed but not their text (e.g. the
+--     Cloudflare ID backfill): drop only the cached pages containing them
+CREATE OR REPLACE FUNCTION invalidate_search_cache()
+RETURNS TRIGGER AS $$
+DECLARE
+    match_vectors TSVECTOR[];
+    payload_ids INTEGER[];
+BEGIN
+    IF TG_OP = 'INSERT' THEN
+        SELECT array_agg(n.search_vector) INTO match_vectors
+        FROM new_rows n
+        WHERE n.rank = 1;
+    ELSIF TG_OP = 'DELETE' THEN
+        SELECT array_agg(o.search_vector) INTO match_vectors
+        FROM old_rows o
+        WHERE o.rank = 1;
+    ELSE
+        SELECT array_agg(v.search_vector) INTO match_vectors
+        FROM old_rows o
+        JOIN new_rows n ON n.id = o.id
+        CROSS JOIN LATERAL (VALUES (o.rank, o.search_vector), (n.rank, n.search_vector)) AS v(rank, search_vector)
+        WHERE v.rank = 1
+          AND (o.search_vector IS DISTINCT FROM n.search_vector
+               OR o.rank IS DISTINCT FROM n.rank
+               OR o.cave_id IS DISTINCT FROM n.cave_id);
+
+        SELECT array_agg(n.image_id) INTO payload_ids
+        FROM old_rows o
+        JOIN new_rows n ON n.id = o.id
+        WHERE (o.image_id, o.subject, o.description, o.plan_id, o.file_path, o.thumbnail,
+               o.cloudflare_image_id, o.cloudflare_thumbnail_id)
+              IS DISTINCT FROM
+              (n.image_id, n.subject, n.description, n.plan_id, n.file_path, n.thumbnail,
+               n.cloudflare_image_id, n.cloudflare_thumbnail_id);
+    END IF;
+
+    IF payload_ids IS NOT NULL THEN
+        DELETE FROM search_cache
+        WHERE image_ids && payload_ids;
+    END IF;
+
+    IF match_vectors IS NOT NULL THEN
+        -- match_all = FALSE: also covers queries served by the OR fallback
+        DELETE FROM search_cache c
+        USING (
+            SELECT q.query_norm, expand_search_query(q.query_norm, FALSE) AS ts_query
+            FROM (SELECT DISTINCT query_norm FROM search_cache) q
+        ) e
+        WHERE c.query_norm = e.query_norm
+          AND EXISTS (SELECT 1 FROM unnest(match_vectors) AS v(sv) WHERE v.sv @@ e.ts_query);
+    END IF;
+
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql SECURITY DEFINER SET search_path = public, extensions;
+
+-- ============================================
+-- TRIGGERS
+-- ============================================
+
+-- Transition tables cannot be combined with UPDATE OF column lists or
+-- shared across events, so each event gets its own statement trigger
+DROP TRIGGER IF EXISTS trigger_invalidate_search_cache ON images;
+
+DROP TRIGGER IF EXISTS trigger_invalidate_search_cache_insert ON images;
+CREATE TRIGGER trigger_invalidate_search_cache_insert
+    AFTER INSERT ON images
+    REFERENCING NEW TABLE AS new_rows
+    FOR EACH STATEMENT
+    EXECUTE FUNCTION invalidate_search_cache();
+
+DROP TRIGGER IF EXISTS trigger_invalidate_search_cache_update ON images;
+CREATE TRIGGER trigger_invalidate_search_cache_update
+    AFTER UPDATE ON images
+    REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+    FOR EACH STATEMENT
+    EXECUTE FUNCTION invalidate_search_cache();
+
+DROP TRIGGER IF EXISTS trigger_invalidate_search_cache_delete ON images;
+CREATE TRIGGER trigger_invalidate_search_cache_delete
+    AFTER DELETE ON images
+    REFERENCING OLD TABLE AS old_rows
+    FOR EACH STATEMENT
+    EXECUTE FUNCTION invalidate_search_cache();
+
+GRANT EXECUTE ON FUNCTION search_images_cached TO anon;
+GRANT EXECUTE ON FUNCTION search_images_cached TO authenticated;
+
+-- ============================================
+-- COMMENTS
+-- ============================================
+
+COMMENT ON TABLE search_query_log IS 'Normalized search queries, read by refresh_search_cache.py';
+COMMENT ON TABLE search_cache IS 'Precomputed result pages of popular searches';
+COMMENT ON COLUMN search_cache.image_ids IS 'image_id of every result, for invalidation';
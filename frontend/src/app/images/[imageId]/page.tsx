@@ -8,7 +8,7 @@
 import { notFound } from 'next/navigation';
 import Link from 'next/link';
 import { ArrowLeft, MapPin, Download } from 'lucide-react';
-import { fetchImageDetail, fetchCaveDetail, fetchCaveFloorImages, ImageDetail } from '@/lib/api';
+import { fetchImageDetail, fetchCaveDetail, fetchCaveFloorImages, fetchRelatedImages, ImageDetail } from '@/lib/api';
 
 // Use edge runtime for Cloudflare Pages
 export const runtime = 'edge';
@@ -36,6 +36,7 @@ export default async function ImagePage({ params }: ImagePageProps) {
   // Fetch cave info and related images
   let cave = null;
   let relatedImages: any[] = [];
+  let similarImages: any[] = [];
   
   try {
     cave = await fetchCaveDetail(String(image.cave_id));
@@ -52,6 +53,12 @@ export default async function ImagePage({ params }: ImagePageProps) {
     console.error('Error fetching related images:', error);
   }
   
+  try {
+    similarImages = await fetchRelatedImages(image.id);
+  } catch (error) {
+    console.error('Error fetching similar images:', error);
+  }
+  
   // Image URL is already full URL from API
   const fullImageUrl = image.image_url;
   
@@ -198,6 +205,35 @@ export default async function ImagePage({ params }: ImagePageProps) {
           </div>
         </div>
 
+        {/* Similar Images */}
+        {similarImages.length > 0 && (
+          <div className="mt-12">
+            <h2 className="text-2xl font-bold text-gray-900 mb-6">
+              Similar images
+            </h2>
+            <div className="grid grid-cols-2 sm:grid-cols-3 md:grid-cols-4 lg:grid-cols-6 gap-4">
+              {similarImages.map((relImg) => (
+                <Link
+                  key={relImg.id}
+                  href={`/images/${relImg.id}`}
+                  className="group relative aspect-square bg-gray-100 rounded-lg overflow-hidden hover:shadow-lg transition-shadow"
+                >
+                  <img
+                    src={relImg.thumbnail_url || relImg.image_url}
+                    alt={relImg.subject || `Image ${relImg.id}`}
+                    className="w-full h-full object-cover group-hover:scale-105 transition-transform duration-300"
+                  />
+                  {relImg.subject && (
+                    <div className="absolute bottom-0 left-0 right-0 bg-gradient-to-t from-black/70 to-transparent p-2">
+                      <p className="text-white text-xs truncate">{relImg.subject}</p>
+                    </div>
+                  )}
+                </Link>
+              ))}
+            </div>
+          </div>
+        )}
+
         {/* Related Images */}
         {relatedImages.length > 0 && (
           <div className="mt-12">
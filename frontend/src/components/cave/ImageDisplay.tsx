@@ -3,6 +3,7 @@
 import { useState, useEffect, useCallback } from 'react';
 import { ChevronLeft, ChevronRight, Maximize2, Minimize2, X } from 'lucide-react';
 import { Image as ImageType } from '@/lib/api';
+import { getPlaceholderStyle } from '@/lib/cloudflare-images';
 
 interface ImageDisplayProps {
   image: ImageType | null;
@@ -24,6 +25,7 @@ export default function ImageDisplay({
   totalImages = 0
 }: ImageDisplayProps) {
   const [isFullscreen, setIsFullscreen] = useState(false);
+  const [loadedUrl, setLoadedUrl] = useState<string | null>(null);
 
   // Handle keyboard navigation in fullscreen
   const handleKeyDown = useCallback((e: KeyboardEvent) => {
@@ -80,6 +82,8 @@ export default function ImageDisplay({
             src={fullImageUrl}
             alt={image.subject || `Cave image ${image.id}`}
             className="w-full h-auto object-contain max-h-[calc(100vh-300px)]"
+            style={loadedUrl === fullImageUrl ? undefined : getPlaceholderStyle(image.placeholder)}
+            onLoad={() => setLoadedUrl(fullImageUrl)}
             loading="lazy"
           />
           
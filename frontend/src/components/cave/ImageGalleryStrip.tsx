@@ -1,7 +1,9 @@
 // components/cave/ImageGalleryStrip.tsx
 'use client';
 
+import { useState } from 'react';
 import { Image as ImageType } from '@/lib/api';
+import { getPlaceholderStyle } from '@/lib/cloudflare-images';
 
 interface ImageGalleryStripProps {
   images: ImageType[];
@@ -18,6 +20,7 @@ export default function ImageGalleryStrip({
   cave,
   floorNumber
 }: ImageGalleryStripProps) {
+  const [loadedIds, setLoadedIds] = useState<Set<number>>(new Set());
   const validImages = images.filter(img => img.image_url && img.image_url.trim() !== '');
   
   return (
@@ -56,6 +59,8 @@ export default function ImageGalleryStrip({
                   src={thumbnailUrl}
                   alt={image.subject || `Image ${image.id}`}
                   className="h-full w-auto object-contain rounded"
+                  style={loadedIds.has(image.id) ? undefined : getPlaceholderStyle(image.placeholder)}
+                  onLoad={() => setLoadedIds(prev => new Set(prev).add(image.id))}
                   loading="lazy"
                 />
                 {/* Green dot indicator for images with floor plan coordinates */}
@@ -10,6 +10,7 @@
 import Link from 'next/link';
 import Image from 'next/image';
 import { Image as ImageType } from '@/lib/api';
+import { getPlaceholderStyle } from '@/lib/cloudflare-images';
 
 interface ImageGalleryProps {
   images: ImageType[];
@@ -39,7 +40,10 @@ export default function ImageGallery({ images }: ImageGalleryProps) {
             href={`/images/${image.id}`}
             className="group block bg-white rounded-lg overflow-hidden shadow hover:shadow-md transition-shadow"
           >
-            <div className="aspect-square bg-gray-100 relative overflow-hidden">
+            <div
+              className="aspect-square bg-gray-100 relative overflow-hidden"
+              style={getPlaceholderStyle(image.placeholder, false)}
+            >
               <Image
                 src={fullImageUrl}
                 alt={image.subject || 'Cave image'}
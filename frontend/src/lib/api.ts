@@ -11,6 +11,7 @@ import {
   getCaveFloorImages as dbGetCaveFloorImages,
   getCaveImages as dbGetCaveImages,
   getImage as dbGetImage,
+  getRelatedImages as dbGetRelatedImages,
   searchImages as dbSearchImages,
   getAllCaveIds as dbGetAllCaveIds,
   DbCave, 
@@ -36,6 +37,12 @@ export interface Coordinates {
   plan_y_norm?: number;
 }
 
+export interface Placeholder {
+  color: string;
+  lqip?: string;
+  aspect?: number;
+}
+
 export interface Image {
   id: number;
   file_path: string;
@@ -45,6 +52,7 @@ export interface Image {
   coordinates?: Coordinates;
   image_url: string;
   thumbnail_url: string;
+  placeholder?: Placeholder;
 }
 
 export interface ImageDetail extends Image {
@@ -138,6 +146,11 @@ function transformImage(dbImage: DbImage): Image {
       dbImage.file_path,
       dbImage.thumbnail
     ),
+    placeholder: dbImage.placeholder_color ? {
+      color: dbImage.placeholder_color,
+      lqip: dbImage.placeholder_lqip || undefined,
+      aspect: dbImage.placeholder_aspect || undefined,
+    } : undefined,
   };
 }
 
@@ -215,6 +228,14 @@ export async function fetchImageDetail(imageId: number): Promise<ImageDetail> {
   return transformImageDetail(data);
 }
 
+/**
+ * Fetch images with the most similar subject, motifs and description
+ */
+export async function fetchRelatedImages(imageId: number, limit: number = 6): Promise<Image[]> {
+  const data = await dbGetRelatedImages(imageId, limit);
+  return data.filter(Boolean).map(transformImage);
+}
+
 /**
  * Search images by query string
  */
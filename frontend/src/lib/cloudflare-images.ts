@@ -5,6 +5,8 @@
  * Supports fallback to local images during development.
  */
 
+import type { CSSProperties } from 'react';
+
 // Cloudflare Images account hash (get from dashboard)
 const CF_ACCOUNT_HASH = process.env.NEXT_PUBLIC_CF_IMAGES_ACCOUNT || '';
 
@@ -47,7 +49,8 @@ export function getCloudflareUrl(cloudflareId: string | null, variant: ImageVari
   // Use fallback variant if the requested one isn't configured in Cloudflare
   const actualVariant = VARIANT_FALLBACK[variant] || 'public';
   
-  return `https://imagedelivery.net/${CF_ACCOUNT_HASH}/${cloudflareId}/${actualVariant}`;
+  // Custom IDs are file paths (e.g. "c16/c16_F1.jpg"); keep the slashes but escape the rest
+  return `https://imagedelivery.net/${CF_ACCOUNT_HASH}/${encodeURI(cloudflareId)}/${actualVariant}`;
 }
 
 /**
@@ -122,3 +125,37 @@ export function getPlanImageUrl(planImage: string | null): string {
   return `/plans/${planImage}`;
 }
 
+
+/**
+ * Get inline styles that paint a precomputed placeholder behind an image
+ * 
+ * The color, tiny preview and aspect ratio are stored in the database (see
+ * generate_placeholders.py), so they render without any extra request.
+ * The aspect ratio gives auto-sized images a box before they load; apply
+ * the style only until the image's onLoad fires, since object-contain
+ * would otherwise leave the preview visible around the image.
+ * 
+ * @param placeholder - Average color, optional data: URI preview and aspect ratio
+ * @param withAspect - Set false for fixed-size containers (e.g. aspect-square
+ *   tiles), where an inline aspect ratio would override their own
+ * @returns Style object to spread onto the image or its container
+ */
+export function getPlaceholderStyle(
+  placeholder?: { color: string; lqip?: string; aspect?: number },
+  withAspect: boolean = true
+): CSSProperties {
+  if (!placeholder) {
+    return {};
+  }
+  
+  const style: CSSProperties = { backgroundColor: placeholder.color };
+  if (placeholder.lqip) {
+    style.backgroundImage = `url("${placeholder.lqip}")`;
+    style.backgroundSize = 'cover';
+    style.backgroundPosition = 'center';
+  }
+  if (withAspect && placeholder.aspect) {
+    style.aspectRatio = String(placeholder.aspect);
+  }
+  return style;
+}
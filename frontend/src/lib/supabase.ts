@@ -83,6 +83,9 @@ export interface DbImage {
   coordinates_questionable: boolean;
   cloudflare_image_id: string | null;
   cloudflare_thumbnail_id: string | null;
+  placeholder_color?: string | null;
+  placeholder_lqip?: string | null;
+  placeholder_aspect?: number | null;
   created_at: string;
   updated_at: string;
 }
@@ -233,6 +236,28 @@ export async function getImage(imageId: number) {
   return data;
 }
 
+/**
+ * Fetch precomputed related images (see build_related_images.py)
+ */
+export async function getRelatedImages(imageId: number, limit: number = 6) {
+  const { data, error } = await supabase
+    .from('related_images')
+    .select(`
+      score,
+      related:images!related_images_related_image_id_fkey(*)
+    `)
+    .eq('image_id', imageId)
+    .order('position')
+    .limit(limit);
+
+  if (error) {
+    console.error('Error fetching related images:', error);
+    throw error;
+  }
+
+  return (data || []).map(row => row.related as unknown as DbImage);
+}
+
 // Synonym mapping for variant spellings (Indian names, Sanskrit transliterations)
 const SYNONYM_MAP: Record<string, string[]> = {
   'siva': ['siva', 'shiva'],
@@ -281,13 +306,18 @@ function expandQueryWithSynonyms(query: string): string[] {
   return Array.from(new Set(expandedTerms)); // Remove duplicates
 }
 
+// Longer queries are rejected by search_images_cached
+const MAX_QUERY_LENGTH = 200;
+
 /**
  * Search images using full-text search + fuzzy matching (ILIKE fallback)
  */
 export async function searchImages(query: string, caveId?: number, page: number = 1, pageSize: number = 20) {
-  // Try RPC function first (if installed)
+  query = query.trim().slice(0, MAX_QUERY_LENGTH);
+
+  // Try RPC function first (if installed); popular queries are served from search_cache
   try {
-    const { data, error } = await supabase.rpc('search_images_fuzzy', {
+    const { data, error } = await supabase.rpc('search_images_cached', {
       search_query: query,
       target_cave_id: caveId || null,
       page_num: page,